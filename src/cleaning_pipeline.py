@@ -8,14 +8,19 @@ Usage:
     python src/cleaning_pipeline.py
 
 Configuration:
-    Edit BASE_DIR, INPUT_FILE, OUTPUT_FILE, LOG_FILE below to match your paths.
+    Edit BASE_DIR, INPUT_FILE, OUTPUT_FILE, OUTPUT_PARQUET_FILE, LOG_FILE below
+    to match your paths.
 """
 
 import pandas as pd
 import numpy as np
 import re
 import os
-from datetime import datetime
+import sys
+import logging
+from collections import defaultdict
+from functools import lru_cache
+from multiprocessing import Pool
 
 # =============================================================================
 # Configuration
@@ -25,6 +30,30 @@ INPUT_FILE  = os.path.join(BASE_DIR, 'data', 'raw', 'DataDoseDataset.csv')
 OUTPUT_FILE = os.path.join(BASE_DIR, 'data', 'processed', 'DataDoseDataset_CleanedDrugs.csv')
 LOG_FILE    = os.path.join(BASE_DIR, 'logs', 'cleaning_logFinal.txt')
 
+# Columnar copy of the cleaned output for downstream steps; set to None to skip.
+OUTPUT_PARQUET_FILE = os.path.join(BASE_DIR, 'data', 'processed', 'DataDoseDataset_CleanedDrugs.parquet')
+
+# Worker processes for the cleaning stage; inputs with fewer distinct
+# ingredient strings are cleaned serially, as start-up would cost more than it saves.
+N_WORKERS         = os.cpu_count() or 1
+PARALLEL_MIN_ROWS = 100_000
+# Distinct strings per task handed to a worker; small enough to balance
+# load across workers, large enough to keep the vectorised passes efficient.
+PARALLEL_CHUNK_ROWS = 10_000
+
+# Rows read, cleaned and written per pass. This bounds the raw input and the
+# intermediate columns held at once; the valid rows returned to the caller and
+# the per-string cleaning caches still grow with the whole file.
+READ_CHUNK_ROWS = 1_000_000
+
+# Ingredient column names, in order of preference; matched exactly first,
+# then case-insensitively.
+INGREDIENT_COLUMN_CANDIDATES = (
+    'ActiveIngredient', 'activeingredient', 'active_ingredient',
+    'Generic Name', 'generic name', 'GenericName',
+    'Ingredients', 'ingredients',
+)
+
 # =============================================================================
 # P0 — Immutable Principles
 # P0.1: Synonym merging is FORBIDDEN (paracetamol ↔ acetaminophen must stay as-is)
@@ -40,6 +69,7 @@ ENCODED_TOKEN_MAP = {
     "__ING0035__": "",       # __ING0035__2           → bare "2" (filtered later)
     "__ING0055__": "iron",   # sp__ING0055__olactone → spironolactone
 }
+ENCODED_TOKEN_PATTERN = re.compile(r'__[A-Z]+\d+__')
 
 # =============================================================================
 # Garbage Terms (Exact-match only — no substring matching)
@@ -60,21 +90,27 @@ GARBAGE_LIST = [
     "selected theraputically",
     "vitamins", "vita", "350m",
 ]
-GARBAGE_EXACT = set(x.strip().lower() for x in GARBAGE_LIST)
+GARBAGE_EXACT = frozenset(x.strip().lower() for x in GARBAGE_LIST)
+
+# Long garbage terms (8+ chars) are also discarded when embedded in a token;
+# one alternation scans the token once instead of once per term.
+GARBAGE_SUBSTRING_PATTERN = re.compile(
+    '|'.join(re.escape(g) for g in sorted(GARBAGE_EXACT) if len(g) >= 8)
+)
 
 # Short tokens that are garbage ONLY when they appear as a complete standalone token
-GARBAGE_TOKENS_EXACT = {
+GARBAGE_TOKENS_EXACT = frozenset({
     "na", "n/a", "amin", "amins", "type", "formula",
     "other", "high", "pre", "mixed", "special",
     "as", "ivay", "potat", "len",
     "2",
     "vitamin",
-}
+})
 
 # =============================================================================
 # NON-DRUG TOKENS — Supplements/marketing terms that are NOT active ingredients
 # =============================================================================
-NON_DRUG_TOKENS = {
+NON_DRUG_TOKENS = frozenset({
     "q10", "coq10", "q 10",
     "royal jelly", "propolis", "bee pollen", "bee wax",
     "antioxidants", "antioxidant",
@@ -97,7 +133,10 @@ NON_DRUG_TOKENS = {
     "resveratrol", "quercetin",
     "spirulina", "chlorella",
     "milk thistle",
-}
+})
+
+# Every exact-match token discard list, for a single lookup per token
+DISCARD_TOKENS_EXACT = GARBAGE_EXACT | GARBAGE_TOKENS_EXACT | NON_DRUG_TOKENS
 
 # =============================================================================
 # R4 — Spell-fix Dictionary (ONLY true typos — NO synonym merging per P0.1!)
@@ -121,6 +160,21 @@ SPELL_FIX = {
     "digoxine":                  "digoxin",
 }
 
+# All typos in one word-boundary alternation, longest first so a shorter typo
+# never pre-empts a longer one (chlorohexidine before chlorohexidin)
+SPELL_FIX_PATTERN = re.compile(
+    r'\b(' + '|'.join(sorted(map(re.escape, SPELL_FIX), key=len, reverse=True)) + r')\b'
+)
+
+
+def _spell_fix_repl(m):
+    return SPELL_FIX[m.group(1)]
+
+
+# Corrected spellings are valid tokens by definition
+SPELL_FIX_TARGETS = frozenset(SPELL_FIX.values())
+
+
 # =============================================================================
 # Manual Replacements — Applied BEFORE generic split
 # =============================================================================
@@ -136,25 +190,32 @@ PLAIN_REPLACEMENTS = {
     ),
 }
 
-# Regex word-boundary replacements for B-vitamin codes (order: longest first)
-BVITAMIN_REGEX = [
-    (re.compile(r'\bvit\b\.?'),  "vitamin "),
-    (re.compile(r'\bb12\b'),     "cobalamin"),
-    (re.compile(r'\bb9\b'),      "folic acid"),
-    (re.compile(r'\bb7\b'),      "biotin"),
-    (re.compile(r'\bb6\b'),      "pyridoxine"),
-    (re.compile(r'\bb5\b'),      "pantothenic acid"),
-    (re.compile(r'\bb3\b'),      "niacin"),
-    (re.compile(r'\bb2\b'),      "riboflavin"),
-    (re.compile(r'\bb1\b'),      "thiamine"),
-]
+# B-vitamin codes and the "vit" abbreviation, matched in a single word-boundary scan
+BVITAMIN_MAP = {
+    "b12": "cobalamin",
+    "b9":  "folic acid",
+    "b7":  "biotin",
+    "b6":  "pyridoxine",
+    "b5":  "pantothenic acid",
+    "b3":  "niacin",
+    "b2":  "riboflavin",
+    "b1":  "thiamine",
+}
+BVITAMIN_PATTERN = re.compile(
+    r'\b(vit)\b\.?|\b(' + '|'.join(BVITAMIN_MAP) + r')\b'
+)
+
+
+def _bvitamin_repl(m):
+    return "vitamin " if m.group(1) else BVITAMIN_MAP[m.group(2)]
+
 
 REPLACEMENTS = PLAIN_REPLACEMENTS
 
 # =============================================================================
 # Known Ingredient Vocabulary — Used for garbage phrase & unknown token detection
 # =============================================================================
-KNOWN_INGREDIENT_KEYWORDS = {
+KNOWN_INGREDIENT_KEYWORDS = frozenset({
     "vitamin", "acid", "calcium", "magnesium", "zinc", "iron", "sodium",
     "potassium", "chloride", "oxide", "hydrochloride", "sulfate", "phosphate",
     "gluconate", "citrate", "acetate", "lactate", "carbonate", "nitrate",
@@ -198,12 +259,18 @@ KNOWN_INGREDIENT_KEYWORDS = {
     "spironolactone", "dandelion", "silymarin", "iodine",
     "poliomyelitis", "inactivated", "attenuated", "poliovirus",
     "willebrand", "von",
-}
+})
+
+# Any keyword occurring as a substring; keywords are single words, so a match
+# in a phrase always lies within one of its words.
+KNOWN_INGREDIENT_PATTERN = re.compile(
+    '|'.join(sorted(map(re.escape, KNOWN_INGREDIENT_KEYWORDS), key=len, reverse=True))
+)
 
 # =============================================================================
 # R5 — Cosmetic / Personal-Care Terms
 # =============================================================================
-COSMETIC_TERMS = {
+COSMETIC_TERMS = frozenset({
     "cream", "shampoo", "lotion", "styling", "smooth", "hair", "gel",
     "serum", "moisturizer", "conditioner", "spray", "foam", "mask",
     "scrub", "toner", "cleanser", "balm", "wax", "polish",
@@ -211,47 +278,53 @@ COSMETIC_TERMS = {
     "fragrance", "deodorant", "sunscreen", "exfoliant", "primer",
     "scalp", "skin", "whitening", "regen", "matrix", "photostable",
     "uva", "uvb",
-}
+})
+
+# Matches the LAST occurrence of each cosmetic term, so counting matches
+# counts distinct terms (same as the set intersection in is_cosmetic_entry)
+COSMETIC_DISTINCT_PATTERN = re.compile(
+    r'\b(' + '|'.join(sorted(COSMETIC_TERMS)) + r')\b(?!.*\b\1\b)'
+)
 
 # =============================================================================
 # R6 — Vague Category Terms
 # =============================================================================
-VAGUE_CATEGORY_EXACT = {
+VAGUE_CATEGORY_EXACT = frozenset({
     "minerals", "elements", "omega", "ors", "carbohydrates",
     "proteins", "multivitamin", "multivitamins",
     "vitamins and minerals", "vitamins", "trace elements",
-}
+})
 
 # =============================================================================
 # R7 — Truncated Token Detection
 # =============================================================================
-TRUNCATED_TOKENS = {
+TRUNCATED_TOKENS = frozenset({
     "ethinyl", "mono", "hydro", "peg", "poly",
     "micronized alpha", "micronized", "dehydro", "desoxy", "nor",
-}
+})
 
 # =============================================================================
 # R8 — Unknown Token Detection
 # =============================================================================
-SHORT_VALID_TOKENS = {
+SHORT_VALID_TOKENS = frozenset({
     "a", "c", "d", "e", "k",
     "d2", "d3", "k1", "k2", "k3",
     "b1", "b2", "b3", "b5", "b6", "b7", "b9", "b12",
     "ors", "rna", "dna", "hiv", "ige", "igg", "iga", "igm",
     "atp", "adp", "nad", "gmp", "amp",
     "viii", "vii", "vi", "iv", "xii", "xiii",
-}
+})
 
 UNKNOWN_TOKEN_PATTERN = re.compile(
     r'^[a-z]{1,3}\d+$'
     r'|^[a-z0-9]{1,3}\s[a-z0-9]{1,2}$'
 )
 
-VALID_VITAMIN_LETTERS = {
+VALID_VITAMIN_LETTERS = frozenset({
     "a", "c", "d", "e", "k",
     "d2", "d3", "k1", "k2", "k3",
     "b1", "b2", "b3", "b5", "b6", "b7", "b9", "b12",
-}
+})
 
 # =============================================================================
 # Pattern for inserting '+' between unseparated known ingredients
@@ -290,21 +363,35 @@ LEADING_NUMBER_PATTERN = re.compile(
     r'(mg|g|gm|mcg|µg|ug|iu|i\s*u|miu|ml|%|units?|tabs?|caps?|amp|vial)?\s*$',
     re.IGNORECASE
 )
+LEADING_DIGIT_PATTERN = re.compile(r'^\d+')
+
+# Per-token cleanup
+WHITESPACE_PATTERN        = re.compile(r'\s+')
+AMIN_PATTERN              = re.compile(r'\bamin[s]?\b')
+EMBEDDED_STRENGTH_PATTERN = re.compile(r'\b([a-z]{4,})\d+$')   # collagen7000 → collagen
 
 
 # =============================================================================
 # Logging
 # =============================================================================
+# One handler per destination for the whole run; the log file is opened on the
+# first message (delay=True) so the entry point can still clear it beforehand.
+logger = logging.getLogger("datadose")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+if not logger.handlers:
+    _formatter = logging.Formatter('[%(asctime)s] %(message)s', '%Y-%m-%d %H:%M:%S')
+    for _handler in (
+        logging.StreamHandler(sys.stdout),
+        logging.FileHandler(LOG_FILE, encoding='utf-8', delay=True),
+    ):
+        _handler.setFormatter(_formatter)
+        logger.addHandler(_handler)
+
+
 def log_message(message):
     """Log messages to console and file with timestamp."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    msg = f"[{timestamp}] {message}"
-    print(msg)
-    try:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(msg + "\n")
-    except Exception:
-        pass
+    logger.info(message)
 
 
 # =============================================================================
@@ -312,14 +399,29 @@ def log_message(message):
 # =============================================================================
 def decode_encoded_tokens(text):
     """Replace __INGxxxx__ placeholders with known decoded values."""
-    if not isinstance(text, str):
+    if not isinstance(text, str) or '__' not in text:
         return text
     for token, replacement in ENCODED_TOKEN_MAP.items():
         text = text.replace(token, replacement)
-    text = re.sub(r'__[A-Z]+\d+__', ' ', text)
+    text = ENCODED_TOKEN_PATTERN.sub(' ', text)
     return text
 
 
+def decode_encoded_series(s):
+    """Column-level decode_encoded_tokens."""
+    for token, replacement in ENCODED_TOKEN_MAP.items():
+        s = s.str.replace(token, replacement, regex=False)
+    return s.str.replace(ENCODED_TOKEN_PATTERN, ' ', regex=True)
+
+
+def find_encoded_series(s):
+    """Encoded tokens found per row, keeping only the rows that have any."""
+    # Plain substring prefilter: the regex only runs on rows containing '__'
+    maybe = s[s.str.contains('__', regex=False, na=False)]
+    found = maybe.str.findall(ENCODED_TOKEN_PATTERN)
+    return found[found.str.len().gt(0)]
+
+
 # =============================================================================
 # R4 — Spell Correction
 # =============================================================================
@@ -327,10 +429,7 @@ def apply_spell_fix(text):
     """Apply spell corrections using word-boundary regex. No synonym merging (P0.1)."""
     if not isinstance(text, str):
         return text
-    for wrong, right in sorted(SPELL_FIX.items(), key=lambda x: -len(x[0])):
-        if wrong in text:
-            text = re.sub(r'\b' + re.escape(wrong) + r'\b', right, text)
-    return text
+    return SPELL_FIX_PATTERN.sub(_spell_fix_repl, text)
 
 
 # =============================================================================
@@ -339,30 +438,25 @@ def apply_spell_fix(text):
 def is_garbage_token(token):
     """Return True if a single ingredient token should be discarded."""
     t = token.strip().lower()
-    if not t or len(t) <= 2:
+    if len(t) <= 2 or t in DISCARD_TOKENS_EXACT:
         return True
-    if t in GARBAGE_EXACT:
-        return True
-    if t in GARBAGE_TOKENS_EXACT:
-        return True
-    if t in NON_DRUG_TOKENS:
-        return True
-    for g in GARBAGE_EXACT:
-        if len(g) >= 8 and g in t:
-            return True
-    return False
+    return bool(GARBAGE_SUBSTRING_PATTERN.search(t))
 
 
 def is_likely_garbage_phrase(text):
     """Detect multi-word free-text with NO recognizable ingredient vocabulary."""
-    words = text.lower().split()
-    if len(words) < 3:
+    text = text.lower()
+    if len(text.split()) < 3:
         return False
-    matches = sum(
-        1 for w in words
-        if any(kw in w for kw in KNOWN_INGREDIENT_KEYWORDS)
+    return not KNOWN_INGREDIENT_PATTERN.search(text)
+
+
+def is_garbage_phrase_series(s):
+    """Column-level is_likely_garbage_phrase for normalized (lower-case) text."""
+    return (
+        s.str.count(r'\S+').ge(3)
+        & ~s.str.contains(KNOWN_INGREDIENT_PATTERN, na=True)
     )
-    return matches == 0
 
 
 # =============================================================================
@@ -376,6 +470,11 @@ def is_cosmetic_entry(text):
     return len(words & COSMETIC_TERMS) >= 2
 
 
+def is_cosmetic_series(s):
+    """Column-level is_cosmetic_entry for normalized (lower-case) text."""
+    return s.str.count(COSMETIC_DISTINCT_PATTERN).ge(2)
+
+
 # =============================================================================
 # R6 — Vague Category Detection
 # =============================================================================
@@ -399,8 +498,6 @@ def has_truncated_token(parts):
         p_lower = p.strip().lower()
         if p_lower in TRUNCATED_TOKENS:
             return True
-        if re.match(r'^(hydro|mono|poly|peg|dehydro|desoxy|nor)$', p_lower):
-            return True
     return False
 
 
@@ -416,10 +513,9 @@ def classify_token(token):
         return 'valid'
     if t.startswith('vitamin '):
         return 'valid'
-    for kw in KNOWN_INGREDIENT_KEYWORDS:
-        if kw in t:
-            return 'valid'
-    if t in SPELL_FIX.values():
+    if KNOWN_INGREDIENT_PATTERN.search(t):
+        return 'valid'
+    if t in SPELL_FIX_TARGETS:
         return 'valid'
     if UNKNOWN_TOKEN_PATTERN.match(t):
         return 'unknown'
@@ -431,25 +527,106 @@ def classify_token(token):
 # =============================================================================
 # R11 — Omega Format Normalization
 # =============================================================================
+def _expand_omega_multi(m):
+    nums = m.group(1).split('-')
+    return ' + '.join('omega ' + n for n in nums)
+
+
+def _expand_omega_spaced(m):
+    nums = m.group(1).strip().split()
+    if len(nums) > 1:
+        return ' + '.join('omega ' + n for n in nums)
+    return 'omega ' + nums[0]
+
+
+OMEGA_PASSES = [
+    (re.compile(r'\bomega-(\d+(?:-\d+)+)\b'),     _expand_omega_multi),
+    (re.compile(r'\bomega-(\d+)\b'),               r'omega \1'),
+    (re.compile(r'\bomega\s+(\d+(?:\s+\d+)+)\b'), _expand_omega_spaced),
+]
+
+
 def normalize_omega(text):
     """R11: Split omega combos into separate + tokens."""
-    def expand_omega_multi(m):
-        nums = m.group(1).split('-')
-        return ' + '.join('omega ' + n for n in nums)
+    return _apply_passes(text, OMEGA_PASSES)
+
+
+# =============================================================================
+# Normalization Passes
+# Ordered (pattern, replacement) pairs shared by normalize_text (per row) and
+# normalize_series (whole column), so both paths stay rule-for-rule identical.
+# =============================================================================
+SEPARATOR_PASSES = [
+    # Vitamin abbreviations
+    (re.compile(r'\bvit\.?\s+'), 'vitamin '),
+    # Remove 'amin/amins' artifacts ('vitamin amins' → 'vitamin')
+    (re.compile(r'\b(vitamin)\s+amins?\b|\bamins?\b'), r'\1'),
+    # Brackets → separators
+    (re.compile(r'\(([^)]*)\)'), r' + \1'),
+    # Insert '+' before 'vitamin' when missing
+    (re.compile(r'(?<!\+)\s+(vitamin\s)'), r' + \1'),
+    # Insert '+' between known unseparated ingredients
+    (UNSEPARATED_SPLIT_PATTERN, ' + '),
+    # R1 — Normalize all separators → ' + '
+    (re.compile(r'(--|–|-|/|,|;|\\|&| and | with |&|\+)'), ' + '),
+]
+
+# R3 — "type N" is kept only when the row has a medical context for it
+_TYPE_MEDICAL_CONTEXT = frozenset({
+    "poliomyelitis", "poliovirus", "vaccine", "hepatitis",
+    "diphtheria", "pertussis", "meningitis", "rotavirus",
+    "herpes", "adenovirus", "coronavirus", "influenza",
+    "dengue", "rabies", "typhoid", "cholera",
+    "collagen", "diabetes",
+})
+# Plain substring test (no word boundaries), e.g. 'antidiabetes' still counts
+_TYPE_CONTEXT_PATTERN = re.compile('|'.join(sorted(_TYPE_MEDICAL_CONTEXT)))
+_TYPE_N_PATTERN     = re.compile(r'\btype\s+(\d+)\b')
+_TYPE_SENTINEL      = r'__TYPEPROT\1__'
+_TYPE_RESTORE_PASS  = (re.compile(r'__TYPEPROT(\d+)__'), r'type \1')
+
+DOSE_PASSES = [
+    # R3 — Remove dosage strengths
+    (DOSE_UNIT_PATTERN, ' '),
+    (re.compile(r'\b\d{2,}\b'), ' '),
+    (re.compile(r'(?<=[a-z])\s+\d+(?:\s+\d+)*\s*$'), ' '),
+    (re.compile(r'(?<=[a-z])\s+0\s+\d+'), ' '),
+    (re.compile(r'(?<=[a-z])\s+\d\s+\d+\b'), ' '),
+    # Protect omega N and type N while dropping other trailing digits
+    (re.compile(r'\bomega\s+(\d)\b'), r'omega__OMGPROT__\1'),
+    (re.compile(r'\btype\s+(\d)\b'), r'type__TYPROT__\1'),
+    (re.compile(r'(?<=[a-z])\s+\d\b'), ' '),
+    (re.compile(r'omega__OMGPROT__'), 'omega '),
+    (re.compile(r'type__TYPROT__'), 'type '),
+    _TYPE_RESTORE_PASS,
+]
 
-    text = re.sub(r'\bomega-(\d+(?:-\d+)+)\b', expand_omega_multi, text)
-    text = re.sub(r'\bomega-(\d+)\b', r'omega \1', text)
 
-    def expand_omega_spaced(m):
-        nums = m.group(1).strip().split()
-        if len(nums) > 1:
-            return ' + '.join('omega ' + n for n in nums)
-        return 'omega ' + nums[0]
+def _cleanup_repl(m):
+    return ' + ' if '+' in m.group(0) else ' '
 
-    text = re.sub(r'\bomega\s+(\d+(?:\s+\d+)+)\b', expand_omega_spaced, text)
+
+CLEANUP_PASSES = [
+    # Remove special characters, collapse whitespace and space out '+' in one
+    # scan: each run of other characters becomes ' + ' around a '+', else ' '
+    (re.compile(r'[^a-z0-9+]*\+[^a-z0-9+]*|[^a-z0-9+]+'), _cleanup_repl),
+]
+
+
+def _apply_passes(text, passes):
+    """Apply (pattern, replacement) passes to a single string, in order."""
+    for pattern, repl in passes:
+        text = pattern.sub(repl, text)
     return text
 
 
+def _apply_passes_series(s, passes):
+    """Apply (pattern, replacement) passes to a whole string Series, in order."""
+    for pattern, repl in passes:
+        s = s.str.replace(pattern, repl, regex=True)
+    return s
+
+
 # =============================================================================
 # Text Normalization
 # =============================================================================
@@ -469,79 +646,64 @@ def normalize_text(text):
 
     # Plain replacements
     for wrong, right in PLAIN_REPLACEMENTS.items():
-        if wrong in text:
-            text = text.replace(wrong, right)
+        text = text.replace(wrong, right)
 
     # B-vitamin codes
-    for pattern, right in BVITAMIN_REGEX:
-        text = pattern.sub(right, text)
+    text = BVITAMIN_PATTERN.sub(_bvitamin_repl, text)
 
     # R11 — Omega normalization
     text = normalize_omega(text)
 
-    # Vitamin abbreviations
-    text = re.sub(r'\bvit\.?\s+', 'vitamin ', text)
+    text = _apply_passes(text, SEPARATOR_PASSES)
 
-    # Remove 'amin/amins' artifacts
-    text = re.sub(r'\bvitamin\s+amins?\b', 'vitamin', text)
-    text = re.sub(r'\bamins?\b', '', text)
+    # R3 — Protect "type N" in medical context, drop it otherwise
+    if _TYPE_CONTEXT_PATTERN.search(text):
+        text = _TYPE_N_PATTERN.sub(_TYPE_SENTINEL, text)
+    else:
+        text = _TYPE_N_PATTERN.sub(' ', text)
 
-    # Brackets → separators
-    text = re.sub(r'\(([^)]*)\)', r' + \1', text)
+    text = _apply_passes(text, DOSE_PASSES)
+    text = _apply_passes(text, CLEANUP_PASSES).strip()
+    text = text.strip('+ ')
 
-    # Insert '+' before 'vitamin' when missing
-    text = re.sub(r'(?<!\+)\s+(vitamin\s)', r' + \1', text)
+    return text if text else None
 
-    # Insert '+' between known unseparated ingredients
-    text = UNSEPARATED_SPLIT_PATTERN.sub(' + ', text)
 
-    # R1 — Normalize all separators → ' + '
-    text = re.sub(r'(--|–|-|/|,|;|\\|&| and | with |&|\+)', ' + ', text)
+def normalize_series(s):
+    """Column-level normalize_text: same rules, one vectorized pass per rule.
 
-    # R3 — Remove dosage strengths
-    _TYPE_MEDICAL_CONTEXT = {
-        "poliomyelitis", "poliovirus", "vaccine", "hepatitis",
-        "diphtheria", "pertussis", "meningitis", "rotavirus",
-        "herpes", "adenovirus", "coronavirus", "influenza",
-        "dengue", "rabies", "typhoid", "cholera",
-        "collagen", "diabetes",
-    }
-    _full_has_type_context = any(kw in text for kw in _TYPE_MEDICAL_CONTEXT)
-    _type_protected = {}
-
-    def _protect_type_smart(m):
-        if _full_has_type_context:
-            key = "__TYPEPROT" + str(len(_type_protected)) + "__"
-            _type_protected[key] = m.group(0).strip()
-            return key
-        return " "
-
-    text = re.sub(r'\btype\s+\d+\b', _protect_type_smart, text)
-    text = DOSE_UNIT_PATTERN.sub(' ', text)
-    text = re.sub(r'\b\d{2,}\b', ' ', text)
-    text = re.sub(r'(?<=[a-z])\s+\d+(?:\s+\d+)*\s*$', ' ', text)
-    text = re.sub(r'(?<=[a-z])\s+0\s+\d+', ' ', text)
-    text = re.sub(r'(?<=[a-z])\s+\d\s+\d+\b', ' ', text)
-
-    # Protect omega N and type N
-    text = re.sub(r'\bomega\s+(\d)\b', r'omega__OMGPROT__\1', text)
-    text = re.sub(r'\btype\s+(\d)\b', r'type__TYPROT__\1', text)
-    text = re.sub(r'(?<=[a-z])\s+\d\b', ' ', text)
-    text = text.replace('omega__OMGPROT__', 'omega ')
-    text = text.replace('type__TYPROT__', 'type ')
-
-    for key, val in _type_protected.items():
-        text = text.replace(key, val)
-
-    # Remove special characters
-    text = re.sub(r'[^a-z0-9+\s]', ' ', text)
-
-    # Clean whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    text = re.sub(r'\s*\+\s*', ' + ', text).strip()
-    text = text.strip('+ ')
+    Missing, non-string, empty and garbage entries come back as NaN.
+    """
+    s = s.str.strip()
+    s = s.where(s.ne('') & ~s.str.lower().isin(GARBAGE_EXACT))
+    s = s.str.lower()
 
-    return text if text else None
+    # R4 — Spell fix
+    s = s.str.replace(SPELL_FIX_PATTERN, _spell_fix_repl, regex=True)
+
+    # Plain replacements
+    for wrong, right in PLAIN_REPLACEMENTS.items():
+        s = s.str.replace(wrong, right, regex=False)
+
+    # B-vitamin codes
+    s = s.str.replace(BVITAMIN_PATTERN, _bvitamin_repl, regex=True)
+
+    # R11 — Omega normalization
+    s = _apply_passes_series(s, OMEGA_PASSES)
+
+    s = _apply_passes_series(s, SEPARATOR_PASSES)
+
+    # R3 — Protect "type N" in medical context, drop it otherwise
+    has_context = s.str.contains(_TYPE_CONTEXT_PATTERN, na=False)
+    s = s.str.replace(_TYPE_N_PATTERN, _TYPE_SENTINEL, regex=True).where(
+        has_context, s.str.replace(_TYPE_N_PATTERN, ' ', regex=True)
+    )
+
+    s = _apply_passes_series(s, DOSE_PASSES)
+    s = _apply_passes_series(s, CLEANUP_PASSES).str.strip()
+    s = s.str.strip('+ ')
+
+    return s.where(s.ne(''))
 
 
 # =============================================================================
@@ -572,20 +734,36 @@ def expand_vitamin_shortcuts(parts, original_text):
 # =============================================================================
 def remove_leading_numeric_tokens(parts):
     """R3.1: Drop tokens from the START that are purely numeric or dose-only."""
-    while parts:
-        first = parts[0].strip()
-        if LEADING_NUMBER_PATTERN.match(first):
-            parts = parts[1:]
-        elif re.match(r'^\d+$', first):
-            parts = parts[1:]
-        else:
-            break
-    return parts
+    # LEADING_NUMBER_PATTERN also covers bare digit runs ('150')
+    i = 0
+    while i < len(parts) and LEADING_NUMBER_PATTERN.match(parts[i].strip()):
+        i += 1
+    return parts[i:]
 
 
 # =============================================================================
 # Clean Individual Ingredients List
 # =============================================================================
+@lru_cache(maxsize=None)
+def clean_token(ingredient):
+    """Clean and classify one ingredient token.
+
+    Returns (token, is_unknown); token is None when the token is discarded.
+    Memoized: the same few thousand tokens recur across most rows.
+    """
+    ingredient = WHITESPACE_PATTERN.sub(' ', ingredient).strip()
+    ingredient = AMIN_PATTERN.sub('', ingredient).strip()
+    ingredient = EMBEDDED_STRENGTH_PATTERN.sub(r'\1', ingredient)
+    ingredient = WHITESPACE_PATTERN.sub(' ', ingredient).strip()
+
+    if is_garbage_token(ingredient):
+        return (None, False)
+    if len(ingredient) <= 2:
+        return (None, False)
+
+    return (ingredient, classify_token(ingredient) == 'unknown')
+
+
 def clean_ingredient_list(parts, original_text):
     """Clean ingredient tokens: expand, filter, classify, deduplicate, sort."""
     parts = expand_vitamin_shortcuts(parts, original_text)
@@ -594,50 +772,78 @@ def clean_ingredient_list(parts, original_text):
     cleaned     = []
     token_flags = []
 
-    for ingredient in parts:
-        ingredient = re.sub(r'\s+', ' ', ingredient).strip()
-        ingredient = re.sub(r'\bamin[s]?\b', '', ingredient).strip()
-        ingredient = re.sub(r'\b([a-z]{4,})\d+$', r'\1', ingredient)
-        ingredient = re.sub(r'\s+', ' ', ingredient).strip()
-
-        if is_garbage_token(ingredient):
-            continue
-        if len(ingredient) <= 2:
+    for part in parts:
+        ingredient, is_unknown = clean_token(part)
+        if ingredient is None:
             continue
-
-        token_class = classify_token(ingredient)
-        if token_class == 'unknown':
+        if is_unknown:
             token_flags.append((ingredient, 'UNKNOWN'))
-
         cleaned.append(ingredient)
 
-    return sorted(set(cleaned)), token_flags
+    # Canonical alphabetical order is part of the output contract; most rows are
+    # single-ingredient and need no dedup/sort at all
+    if len(cleaned) > 1:
+        cleaned = sorted(set(cleaned))
+    return cleaned, token_flags
 
 
 # =============================================================================
 # Main Per-Row Cleaning Function
+# Results are (result, row_flag, unknown_tokens) tuples so they can be cached;
+# unknown_tokens is already '|'-joined, ready to be stored as a column.
 # =============================================================================
+_EMPTY_RESULT = (None, "", "")
+RESULT_COLUMNS = ['activeingredient_clean', 'row_flag', 'unknown_tokens']
+
+
 def clean_active_ingredient(text):
     """Complete per-row pipeline: decode → normalize → filter → clean → validate."""
-    row_flags      = []
-    unknown_tokens = []
+    # Cheap exits before any regex work. Of all 1–2 character entries, only
+    # the B-vitamin codes survive the pipeline (b1 → thiamine).
+    if not isinstance(text, str):
+        return _EMPTY_RESULT
+    t0 = text.strip().lower()
+    if t0 in GARBAGE_EXACT:
+        return _EMPTY_RESULT
+    if len(t0) <= 2 and t0 not in BVITAMIN_MAP:
+        return _EMPTY_RESULT
 
     text = decode_encoded_tokens(text)
-    normalized = normalize_text(text)
-    if normalized is None:
-        return {"result": None, "row_flag": "", "unknown_tokens": []}
+    return clean_normalized_ingredient(normalize_text(text))
+
+
+def clean_normalized_ingredient(normalized):
+    """Per-row tail of the pipeline for already-normalized text: filter → clean → validate."""
+    if not isinstance(normalized, str) or not normalized:
+        return _EMPTY_RESULT
 
     if is_likely_garbage_phrase(normalized):
-        return {"result": None, "row_flag": "", "unknown_tokens": []}
+        return _EMPTY_RESULT
 
     if is_cosmetic_entry(normalized):
-        return {"result": None, "row_flag": "COSMETIC", "unknown_tokens": []}
+        return (None, "COSMETIC", "")
+
+    return clean_filtered_ingredient(normalized)
+
+
+@lru_cache(maxsize=None)
+def clean_filtered_ingredient(normalized):
+    """Clean → validate normalized text that passed the garbage and cosmetic filters.
+
+    Memoized: ingredient strings repeat heavily across SKUs, and the result is
+    a pure function of the normalized text.
+    """
+    row_flags      = []
+    unknown_tokens = ""
+
+    if not normalized:
+        return _EMPTY_RESULT
 
     parts = [p.strip() for p in normalized.split('+')]
     cleaned_parts, token_flags = clean_ingredient_list(parts, normalized)
 
     if not cleaned_parts:
-        return {"result": None, "row_flag": "", "unknown_tokens": []}
+        return _EMPTY_RESULT
 
     joined = " + ".join(cleaned_parts)
     if is_vague_category(joined):
@@ -647,24 +853,143 @@ def clean_active_ingredient(text):
         row_flags.append("TRUNCATED")
 
     if token_flags:
-        unknown_tokens = [t for t, _ in token_flags]
+        unknown_tokens = "|".join(t for t, _ in token_flags)
         row_flags.append("HAS_UNKNOWN_TOKENS")
 
-    if cleaned_parts and re.match(r'^\d+', cleaned_parts[0]):
+    if cleaned_parts and LEADING_DIGIT_PATTERN.match(cleaned_parts[0]):
         row_flags.append("LEADING_NUMBER_UNRESOLVED")
 
-    return {
-        "result":         joined,
-        "row_flag":       ",".join(row_flags) if row_flags else "",
-        "unknown_tokens": unknown_tokens,
-    }
+    return (
+        joined,
+        ",".join(row_flags) if row_flags else "",
+        unknown_tokens,
+    )
+
+
+# =============================================================================
+# Column-Level Cleaning
+# =============================================================================
+def clean_ingredient_series(s):
+    """Clean a raw ingredient Series → activeingredient_clean / row_flag / unknown_tokens."""
+    # The passes use compiled patterns, lookarounds and callbacks that Arrow
+    # string arrays reject on pandas 2.x, so they run on plain Python strings
+    normalized = normalize_series(decode_encoded_series(s.astype(object)))
+
+    # Whole-column filters first; only surviving rows reach the per-row stage
+    garbage_mask  = is_garbage_phrase_series(normalized)
+    cosmetic_mask = is_cosmetic_series(normalized) & ~garbage_mask
+    candidates    = normalized.where(~(garbage_mask | cosmetic_mask))
+
+    rows = [clean_filtered_ingredient(text) for text in candidates.fillna('').to_numpy()]
+    out  = pd.DataFrame(rows, index=s.index, columns=RESULT_COLUMNS)
+    out.loc[cosmetic_mask, 'row_flag'] = "COSMETIC"
+    return out
+
+
+def _clean_numbered_chunk(item):
+    """Clean one (position, chunk) pair; results may arrive out of order."""
+    i, chunk = item
+    return i, clean_ingredient_series(chunk)
+
+
+def clean_ingredient_column(s, n_workers=None):
+    """Clean each distinct ingredient string once, then broadcast back to every row.
+
+    The same ingredient string repeats across many SKUs, so only the unique
+    values are cleaned — in parallel chunks across worker processes when
+    there are enough of them. Missing rows come back empty.
+    """
+    uniq = s.dropna().drop_duplicates()
+    log_message(f"Cleaning {len(uniq):,} distinct ingredient strings "
+                f"({len(s):,} rows)...")
+
+    n_workers = n_workers or N_WORKERS
+    if n_workers <= 1 or len(uniq) < PARALLEL_MIN_ROWS:
+        cleaned = clean_ingredient_series(uniq)
+    else:
+        log_message(f"Cleaning in parallel with {n_workers} workers...")
+        chunks = [uniq.iloc[lo:lo + PARALLEL_CHUNK_ROWS]
+                  for lo in range(0, len(uniq), PARALLEL_CHUNK_ROWS)]
+        with Pool(n_workers) as pool:
+            done = dict(pool.imap_unordered(_clean_numbered_chunk, enumerate(chunks)))
+        cleaned = pd.concat([done[i] for i in range(len(chunks))])
+
+    out = cleaned.set_axis(uniq.to_numpy()).reindex(s.to_numpy()).set_axis(s.index)
+    out[['row_flag', 'unknown_tokens']] = out[['row_flag', 'unknown_tokens']].fillna("")
+    return out
+
+
+# =============================================================================
+# Column Detection
+# =============================================================================
+def _find_ingredient_column(columns):
+    """Return the ingredient column name from `columns`, or None if absent."""
+    columns = list(columns)
+    for col in INGREDIENT_COLUMN_CANDIDATES:
+        if col in columns:
+            return col
+    col_lower_map = {c.lower(): c for c in columns}
+    for col in INGREDIENT_COLUMN_CANDIDATES:
+        if col.lower() in col_lower_map:
+            return col_lower_map[col.lower()]
+    return None
+
+
+def _infer_column_dtypes(input_path, skip_col):
+    """Dtypes for columns whose inferred type differs between reader chunks.
+
+    The chunked reader infers each chunk on its own, so an integer column with
+    blanks only in a later chunk would be written as '1' there and '1.0' here.
+    Mixed numeric columns are widened the way a whole-file read would; anything
+    else mixed is read as text.
+    """
+    seen = defaultdict(set)
+    reader = pd.read_csv(input_path, chunksize=READ_CHUNK_ROWS, usecols=lambda c: c != skip_col)
+    for chunk in reader:
+        for col, dtype in chunk.dtypes.items():
+            seen[col].add(dtype)
+
+    dtypes = {}
+    for col, kinds in seen.items():
+        if len(kinds) == 1:
+            continue
+        if all(pd.api.types.is_numeric_dtype(k) and not pd.api.types.is_bool_dtype(k)
+               for k in kinds):
+            dtypes[col] = np.result_type(*kinds)
+        else:
+            dtypes[col] = str
+    return dtypes
 
 
 # =============================================================================
 # Main Pipeline
 # =============================================================================
-def clean_drug_ingredients(input_path, output_path):
-    """Full drug-ingredient cleaning pipeline with logging and statistics."""
+def _clean_chunk(df, col_name):
+    """Clean one chunk of raw rows and return only the valid ones."""
+    cleaned = clean_ingredient_column(df[col_name])
+    df[list(cleaned.columns)] = cleaned
+
+    df['Graph_Node_Ingredient'] = df['activeingredient_clean']
+    # One null scan shared by the count and the filter below
+    has_ingredient = df['Graph_Node_Ingredient'].notna().to_numpy()
+    n_separators   = df['Graph_Node_Ingredient'].str.count(r' \+ ').fillna(0).to_numpy(dtype=np.int64)
+    df['ingredient_count'] = np.where(has_ingredient, n_separators + 1, 0)
+    df['is_combination'] = df['ingredient_count'] > 1
+    combo_codes = np.select(
+        [df['ingredient_count'] == 1, df['ingredient_count'] > 1], [0, 1], default=-1,
+    ).astype(np.int8)
+    df['combo_type'] = pd.Categorical.from_codes(combo_codes, categories=['single', 'combo'])
+
+    # Filter invalid / flagged rows; a present ingredient always counts at least 1
+    return df[has_ingredient & (df['row_flag'].to_numpy() == "")]
+
+
+def clean_drug_ingredients(input_path, output_path, parquet_path=None):
+    """Full drug-ingredient cleaning pipeline with logging and statistics.
+
+    The cleaned rows are written to `output_path` as CSV and, when
+    `parquet_path` is given, also to a Parquet file.
+    """
     log_message("=" * 70)
     log_message("DRUG INGREDIENT CLEANING PIPELINE v2 - STARTED")
     log_message("=" * 70)
@@ -673,88 +998,72 @@ def clean_drug_ingredients(input_path, output_path):
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"Input file not found: {input_path}")
 
-    df = pd.read_csv(input_path)
-    initial_count = len(df)
-    log_message(f"Loaded {initial_count:,} rows")
-    log_message(f"Available columns: {list(df.columns)}")
+    # Probe the header only; rows are streamed below
+    raw_columns = pd.read_csv(input_path, nrows=0).columns
+    log_message(f"Available columns: {list(raw_columns)}")
 
     # Find ingredient column
-    df.columns = df.columns.str.strip()
-    possible_cols = [
-        'ActiveIngredient', 'activeingredient', 'active_ingredient',
-        'Generic Name', 'generic name', 'GenericName',
-        'Ingredients', 'ingredients',
-    ]
-
-    col_name = None
-    for col in possible_cols:
-        if col in df.columns:
-            col_name = col
-            break
-
-    if col_name is None:
-        col_lower_map = {c.lower(): c for c in df.columns}
-        for col in possible_cols:
-            if col.lower() in col_lower_map:
-                col_name = col_lower_map[col.lower()]
-                break
-
+    columns = raw_columns.str.strip()
+    col_name = _find_ingredient_column(columns)
     if col_name is None:
         raise ValueError(
             f"Active ingredient column not found. "
-            f"Available columns: {list(df.columns)}"
+            f"Available columns: {list(columns)}"
         )
 
     log_message(f"Found ingredient column: '{col_name}'")
 
-    # Audit encoded tokens
-    encoded_mask  = df[col_name].str.contains(r'__[A-Z]+\d+__', na=False, regex=True)
-    encoded_count = encoded_mask.sum()
-    if encoded_count > 0:
-        log_message(f"Found {encoded_count:,} rows with encoded tokens — decoding...")
-        top_tokens = (
-            df[encoded_mask][col_name]
-            .str.findall(r'__[A-Z]+\d+__')
-            .explode()
-            .value_counts()
-            .head(20)
+    # Clean chunk by chunk, appending valid rows to the output as we go
+    log_message("Starting cleaning process...")
+    initial_count  = 0
+    encoded_count  = 0
+    encoded_tokens = []
+    valid_chunks   = []
+    # Arrow-backed strings: one contiguous buffer instead of a PyObject per cell.
+    # Only the distinct values are copied to object dtype for the regex passes.
+    raw_col_name = raw_columns[columns.get_loc(col_name)]
+    dtypes = _infer_column_dtypes(input_path, raw_col_name)
+    dtypes[raw_col_name] = "string[pyarrow]"
+    reader = pd.read_csv(input_path, chunksize=READ_CHUNK_ROWS, dtype=dtypes)
+    for i, df in enumerate(reader):
+        df.columns = df.columns.str.strip()
+        initial_count += len(df)
+        log_message(f"Processing chunk {i + 1}: {len(df):,} rows")
+
+        # Audit encoded tokens
+        found_tokens   = find_encoded_series(df[col_name])
+        encoded_count += len(found_tokens)
+        encoded_tokens.append(found_tokens.explode())
+
+        chunk_valid = _clean_chunk(df, col_name)
+        valid_chunks.append(chunk_valid)
+
+        # Save
+        cols_to_drop = [c for c in ['row_flag', 'unknown_tokens'] if c in chunk_valid.columns]
+        chunk_valid.drop(columns=cols_to_drop).to_csv(
+            output_path, mode='w' if i == 0 else 'a', header=(i == 0),
+            index=False, encoding='utf-8',
         )
+
+    log_message(f"Loaded {initial_count:,} rows")
+    # The caches span all chunks; parallel runs fill them in the workers instead
+    cache_info = clean_filtered_ingredient.cache_info()
+    if cache_info.misses:
+        log_message(f"Cleaning cache: {cache_info}")
+        log_message(f"Token cache:    {clean_token.cache_info()}")
+    if encoded_count > 0:
+        log_message(f"Decoded encoded tokens in {encoded_count:,} rows")
+        top_tokens = pd.concat(encoded_tokens).value_counts().head(20)
         log_message("Top encoded tokens:\n" + top_tokens.to_string())
     else:
         log_message("No encoded tokens detected.")
 
-    # Apply cleaning
-    log_message("Starting cleaning process...")
-    cleaning_results = df[col_name].apply(clean_active_ingredient)
-
-    df['activeingredient_clean'] = cleaning_results.apply(lambda x: x['result'])
-    df['row_flag']               = cleaning_results.apply(lambda x: x['row_flag'])
-    df['unknown_tokens']         = cleaning_results.apply(
-        lambda x: "|".join(x['unknown_tokens']) if x['unknown_tokens'] else ""
-    )
-
-    df['Graph_Node_Ingredient'] = df['activeingredient_clean']
-    df['ingredient_count'] = df['Graph_Node_Ingredient'].apply(
-        lambda x: len(x.split(' + ')) if pd.notna(x) else 0
-    )
-    df['is_combination'] = df['ingredient_count'] > 1
-    df['combo_type'] = df['ingredient_count'].apply(
-        lambda n: 'single' if n == 1 else ('combo' if n > 1 else np.nan)
-    )
-
-    # Filter invalid / flagged rows
-    df_valid = df[
-        df['Graph_Node_Ingredient'].notna() &
-        (df['ingredient_count'] > 0) &
-        (df['row_flag'] == "")
-    ].reset_index(drop=True)
-
+    df_valid = pd.concat(valid_chunks, ignore_index=True)
     removed_count = initial_count - len(df_valid)
 
-    # Save
-    cols_to_drop = [c for c in ['row_flag', 'unknown_tokens'] if c in df_valid.columns]
-    df_final = df_valid.drop(columns=cols_to_drop)
-    df_final.to_csv(output_path, index=False, encoding='utf-8')
+    if parquet_path:
+        cols_to_drop = [c for c in ['row_flag', 'unknown_tokens'] if c in df_valid.columns]
+        df_valid.drop(columns=cols_to_drop).to_parquet(parquet_path, index=False)
 
     # Summary
     log_message("")
@@ -765,22 +1074,27 @@ def clean_drug_ingredients(input_path, output_path):
     log_message(f"Valid rows retained:      {len(df_valid):,}")
     log_message(f"Invalid rows removed:     {removed_count:,}  "
                 f"({removed_count / initial_count * 100:.1f}%)")
-    log_message(f"Single ingredients:       {(df_valid['combo_type'] == 'single').sum():,}")
-    log_message(f"Combination drugs:        {(df_valid['combo_type'] == 'combo').sum():,}")
-    log_message(f"Average ingredients:      {df_valid['ingredient_count'].mean():.2f}")
-    log_message(f"Max ingredients in combo: {df_valid['ingredient_count'].max()}")
-
-    flag_series = df_valid['row_flag'].str.split(',', expand=True).stack()
+    combo_counts = df_valid['combo_type'].value_counts()
+    count_stats  = df_valid['ingredient_count'].agg(['mean', 'max'])
+    log_message(f"Single ingredients:       {combo_counts.get('single', 0):,}")
+    log_message(f"Combination drugs:        {combo_counts.get('combo', 0):,}")
+    log_message(f"Average ingredients:      {count_stats['mean']:.2f}")
+    log_message(f"Max ingredients in combo: {count_stats['max']:.0f}")
+
+    flagged     = df_valid.loc[df_valid['row_flag'] != "", 'row_flag']
+    flag_series = flagged.str.split(',').explode()
     flag_counts = flag_series[flag_series != ''].value_counts()
     if not flag_counts.empty:
-        log_message("\nRow flag summary (all should be empty — shown for debug):")
-        for flag, cnt in flag_counts.items():
-            log_message(f"  {flag:<35s}: {cnt:,}")
+        log_message("\nRow flag summary (all should be empty — shown for debug):\n" + "\n".join(
+            f"  {flag:<35s}: {cnt:,}" for flag, cnt in flag_counts.items()
+        ))
     else:
         log_message("\nNo flagged rows in output (all clean).")
 
     log_message("")
     log_message(f"Output saved to: {output_path}")
+    if parquet_path:
+        log_message(f"Parquet copy saved to: {parquet_path}")
     log_message("=" * 70)
 
     return df_valid
@@ -789,66 +1103,65 @@ def clean_drug_ingredients(input_path, output_path):
 # =============================================================================
 # Sanity-Check Helper
 # =============================================================================
+# Known edge cases as (raw input, expected output); None means the row is dropped.
+SANITY_SAMPLES = (
+    ("selected theraputically active gereinigter honig", None),
+    ("biotin + folic acid + iron vitamin c folic acid vitamin thiamine + niacin + pantothenic acid + pyridoxine + riboflavin",
+     "biotin + folic acid + iron + niacin + pantothenic acid + pyridoxine + riboflavin + thiamine + vitamin c"),
+    ("human normal immunoglobulins", "human normal immunoglobulin"),
+    ("iodochlorohydroxyquinoline", "iodochlorohydroxyquinoline"),
+    ("dr ey t", None),
+    ("calcium vitamin d3 vitamin k2 zinc boron copper manganese selenium magnesium",
+     "boron + calcium + copper + magnesium + manganese + selenium + vitamin d3 + vitamin k2 + zinc"),
+    ("alpha ketoanalogue of amino acids + histidine + lysine + threonine + tryptophan + tyrosine",
+     "alpha ketoanalogue of amino acids + histidine + lysine + threonine + tryptophan + tyrosine"),
+    ("granulocyte macrofage colony stimulating factor",
+     "granulocyte macrophage colony stimulating factor"),
+    ("__ING0035__2 + dandelion + folic acid + selenium + silymarin + vitamin c + vitamin e + zinc",
+     "dandelion + folic acid + selenium + silymarin + vitamin c + vitamin e + zinc"),
+    ("__ING0024__mins + __ING0035__2 + copper + folic acid + iodine + iron + niacin + pyridoxine + riboflavin + selenium + thiamine + zinc",
+     "copper + folic acid + iodine + iron + niacin + pyridoxine + riboflavin + selenium + thiamine + zinc"),
+    ("350m + cream + hair + smooth + styling", None),
+    ("sp__ING0055__olactone", "spironolactone"),
+    ("__ING0024__mins", None),
+    ("omega-3 + vitamin e", "omega 3 + vitamin e"),
+    ("omega-3-6-9 + vitamin c", "omega 3 + omega 6 + omega 9 + vitamin c"),
+    ("150 + alpha + folic acid + iron", "alpha + folic acid + iron"),
+    ("1000 + folic acid + vitamin b12", "cobalamin + folic acid"),
+    ("cholorohexidine", "chlorhexidine"),
+    ("digoxine", "digoxin"),
+    ("panthenoll", "panthenol"),
+    ("paracetamol", "paracetamol"),
+    ("acetaminophen", "acetaminophen"),
+    ("cream + hair + smooth + styling", None),
+)
+
+
 def test_samples():
     """Run the cleaning function on all known edge-case samples and print results."""
-    samples = [
-        ("selected theraputically active gereinigter honig", None),
-        ("biotin + folic acid + iron vitamin c folic acid vitamin thiamine + niacin + pantothenic acid + pyridoxine + riboflavin",
-         "biotin + folic acid + iron + niacin + pantothenic acid + pyridoxine + riboflavin + thiamine + vitamin c"),
-        ("human normal immunoglobulins", "human normal immunoglobulin"),
-        ("iodochlorohydroxyquinoline", "iodochlorohydroxyquinoline"),
-        ("dr ey t", None),
-        ("calcium vitamin d3 vitamin k2 zinc boron copper manganese selenium magnesium",
-         "boron + calcium + copper + magnesium + manganese + selenium + vitamin d3 + vitamin k2 + zinc"),
-        ("alpha ketoanalogue of amino acids + histidine + lysine + threonine + tryptophan + tyrosine",
-         "alpha ketoanalogue of amino acids + histidine + lysine + threonine + tryptophan + tyrosine"),
-        ("granulocyte macrofage colony stimulating factor",
-         "granulocyte macrophage colony stimulating factor"),
-        ("__ING0035__2 + dandelion + folic acid + selenium + silymarin + vitamin c + vitamin e + zinc",
-         "dandelion + folic acid + selenium + silymarin + vitamin c + vitamin e + zinc"),
-        ("__ING0024__mins + __ING0035__2 + copper + folic acid + iodine + iron + niacin + pyridoxine + riboflavin + selenium + thiamine + zinc",
-         "copper + folic acid + iodine + iron + niacin + pyridoxine + riboflavin + selenium + thiamine + zinc"),
-        ("350m + cream + hair + smooth + styling", None),
-        ("sp__ING0055__olactone", "spironolactone"),
-        ("__ING0024__mins", None),
-        ("omega-3 + vitamin e", "omega 3 + vitamin e"),
-        ("omega-3-6-9 + vitamin c", "omega 3 + omega 6 + omega 9 + vitamin c"),
-        ("150 + alpha + folic acid + iron", "alpha + folic acid + iron"),
-        ("1000 + folic acid + vitamin b12", "cobalamin + folic acid"),
-        ("cholorohexidine", "chlorhexidine"),
-        ("digoxine", "digoxin"),
-        ("panthenoll", "panthenol"),
-        ("paracetamol", "paracetamol"),
-        ("acetaminophen", "acetaminophen"),
-        ("cream + hair + smooth + styling", None),
-    ]
-
-    print("\n" + "=" * 80)
-    print("SANITY CHECK — EDGE CASE SAMPLES")
-    print("=" * 80)
+    lines = ["\n" + "=" * 80, "SANITY CHECK — EDGE CASE SAMPLES", "=" * 80]
 
     passed = failed = 0
 
-    for raw, expected in samples:
-        res    = clean_active_ingredient(raw)
-        result = res['result']
-        flag   = res['row_flag']
+    for raw, expected in SANITY_SAMPLES:
+        result, flag, _ = clean_active_ingredient(raw)
 
         ok   = (result is None and expected is None) or (result == expected)
         icon = "PASS" if ok else "FAIL"
         passed += ok
         failed += (not ok)
 
-        print(f"\n[{icon}]")
-        print(f"  INPUT   : {raw}")
-        print(f"  OUTPUT  : {result}")
-        print(f"  FLAGS   : {flag or '(none)'}")
+        lines.append(f"\n[{icon}]")
+        lines.append(f"  INPUT   : {raw}")
+        lines.append(f"  OUTPUT  : {result}")
+        lines.append(f"  FLAGS   : {flag or '(none)'}")
         if not ok:
-            print(f"  EXPECTED: {expected}")
+            lines.append(f"  EXPECTED: {expected}")
 
-    print("\n" + "=" * 80)
-    print(f"Results: {passed} passed, {failed} failed out of {len(samples)} tests")
-    print("=" * 80 + "\n")
+    lines.append("\n" + "=" * 80)
+    lines.append(f"Results: {passed} passed, {failed} failed out of {len(SANITY_SAMPLES)} tests")
+    lines.append("=" * 80 + "\n")
+    print("\n".join(lines))
     return failed == 0
 
 
@@ -857,47 +1170,43 @@ def test_samples():
 # =============================================================================
 def audit_encoded_tokens(input_path):
     """Scan the raw dataset and print all unique encoded tokens found."""
-    df = pd.read_csv(input_path)
-    df.columns = df.columns.str.strip()
+    raw_columns = pd.read_csv(input_path, nrows=0).columns
+    columns = raw_columns.str.strip()
 
-    possible_cols = [
-        'ActiveIngredient', 'activeingredient', 'active_ingredient',
-        'Generic Name', 'generic name', 'GenericName',
-        'Ingredients', 'ingredients',
-    ]
-    col_name = None
-    for col in possible_cols:
-        if col in df.columns:
-            col_name = col
-            break
-    if col_name is None:
-        col_lower_map = {c.lower(): c for c in df.columns}
-        for col in possible_cols:
-            if col.lower() in col_lower_map:
-                col_name = col_lower_map[col.lower()]
-                break
+    col_name = _find_ingredient_column(columns)
     if col_name is None:
         print("Could not find ingredient column.")
         return
 
-    mask         = df[col_name].str.contains(r'__[A-Z]+\d+__', na=False, regex=True)
-    affected     = df[mask][col_name]
-    all_tokens   = affected.str.findall(r'__[A-Z]+\d+__').explode()
+    raw_col_name = raw_columns[columns.get_loc(col_name)]
+    df = pd.read_csv(
+        input_path, usecols=[raw_col_name],
+        dtype={raw_col_name: "string[pyarrow]"},
+    )
+    df.columns = df.columns.str.strip()
+    texts = df[col_name]
+
+    found        = find_encoded_series(texts)
+    all_tokens   = found.explode()
     token_counts = all_tokens.value_counts()
 
+    # First three rows per token, collected in the same pass
+    examples = defaultdict(list)
+    for text, tokens in zip(texts[found.index], found):
+        for token in dict.fromkeys(tokens):
+            if len(examples[token]) < 3:
+                examples[token].append(text)
+
     print("\n" + "=" * 70)
     print("ENCODED TOKEN AUDIT")
     print("=" * 70)
-    print(f"Rows with encoded tokens: {mask.sum():,}")
+    print(f"Rows with encoded tokens: {len(found):,}")
     print(f"Unique token types:       {len(token_counts)}\n")
     print(token_counts.to_string())
     print("\n--- EXAMPLE ROWS PER TOKEN ---")
-    for token in token_counts.index:
-        examples = df[
-            df[col_name].str.contains(re.escape(token), na=False)
-        ][col_name].head(3).tolist()
-        print(f"\n{token}  (count={token_counts[token]})")
-        for ex in examples:
+    for token, count in token_counts.items():
+        print(f"\n{token}  (count={count})")
+        for ex in examples[token]:
             print(f"  -> {ex}")
     print("=" * 70 + "\n")
 
@@ -917,7 +1226,7 @@ if __name__ == "__main__":
             print("WARNING: Some sanity checks failed. Review before proceeding.\n")
 
         # Run full pipeline
-        df_result = clean_drug_ingredients(INPUT_FILE, OUTPUT_FILE)
+        df_result = clean_drug_ingredients(INPUT_FILE, OUTPUT_FILE, OUTPUT_PARQUET_FILE)
 
         # Display sample output
         print("\n" + "=" * 70)
@@ -926,22 +1235,27 @@ if __name__ == "__main__":
         sample = df_result[
             ['Graph_Node_Ingredient', 'ingredient_count', 'combo_type', 'row_flag']
         ].head(15)
-        for idx, row in sample.iterrows():
-            ingredient = row['Graph_Node_Ingredient']
-            count      = row['ingredient_count']
-            combo      = row['combo_type']
-            flag       = row['row_flag'] or ''
-            display    = ingredient if len(ingredient) <= 60 else ingredient[:57] + "..."
-            flag_str   = f" [{flag}]" if flag else ""
-            print(f"{idx + 1:2d}. [{combo:6s}] ({count} ing){flag_str} {display}")
+        ingredient = sample['Graph_Node_Ingredient']
+        display    = ingredient.where(ingredient.str.len() <= 60, ingredient.str[:57] + "...")
+        flag       = sample['row_flag'].fillna('')
+        flag_str   = (" [" + flag + "]").where(flag != '', '')
+        print("\n".join(
+            f"{idx + 1:2d}. [{combo:6s}] ({count} ing){fs} {disp}"
+            for idx, combo, count, fs, disp in zip(
+                sample.index, sample['combo_type'], sample['ingredient_count'], flag_str, display
+            )
+        ))
 
         print("=" * 70)
         print(f"\nFull results saved to : {OUTPUT_FILE}")
+        if OUTPUT_PARQUET_FILE:
+            print(f"Parquet copy saved to : {OUTPUT_PARQUET_FILE}")
         print(f"Detailed log saved to : {LOG_FILE}")
         print(f"\nSTATISTICS SUMMARY:")
         print(f"   Total valid drugs : {len(df_result):,}")
-        print(f"   Single ingredient : {(df_result['combo_type'] == 'single').sum():,}")
-        print(f"   Combinations      : {(df_result['combo_type'] == 'combo').sum():,}")
+        combo_counts = df_result['combo_type'].value_counts()
+        print(f"   Single ingredient : {combo_counts.get('single', 0):,}")
+        print(f"   Combinations      : {combo_counts.get('combo', 0):,}")
 
     except Exception as e:
         log_message(f"\nERROR OCCURRED: {e}")